@@ -1,16 +1,33 @@
 #!/usr/bin/env python3
 """Analizador léxico y sintáctico"""
 
+from typing import List, Set, Tuple
 from more_itertools import peekable
 from explorador.explorador import Token
 from utilidades.errores import ErrorSintactico
 
+# Precedencia de los operadores binarios, de menor a mayor
+PRECEDENCIAS = {
+    "==": 1,
+    "!=": 1,
+    "<": 1,
+    ">": 1,
+    "<=": 1,
+    ">=": 1,
+    "+": 2,
+    "-": 2,
+    "*": 3,
+    "/": 3,
+}
+PRECEDENCIA_COMPARADOR = 1
+
 """ FORMATO DEL ARBOL SINTACTICO ABSTRACTO
 DECLARACION ::= TIPO_DATO IDENTIFICADOR ASIGNACION EXPRESION PUNTO_Y_COMA
 ASIGNACION ::= IDENTIFICADOR OPERADOR EXPRESION PUNTO_Y_COMA
 PARAMETROS ::= TIPO_DATO IDENTIFICADOR (COMA TIPO_DATO IDENTIFICADOR)*
 LLAMADA_FUNCION ::= IDENTIFICADOR PARENTESIS_IZQUIERDO (PARAMETROS)* PARENTESIS_DERECHO (PUNTO_Y_COMA)?
-EXPRESION ::= FACTOR ((OPERADOR | COMPARADOR) FACTOR)*
+EXPRESION ::= OPERANDO (OPERADOR OPERANDO)*  (cadena n-aria de operadores de igual precedencia)
+OPERANDO ::= EXPRESION | FACTOR
 FACTOR ::= IDENTIFICADOR | NUMERO_ENTERO | NUMERO_FLOTANTE | CADENA | BOOLEANO | PARENTESIS_IZQUIERDO EXPRESION PARENTESIS_DERECHO | LLAMADA_FUNCION
 BIFURCACION ::= si PARENTESIS_IZQUIERDO EXPRESION PARENTESIS_DERECHO LLAVE_IZQUIERDA (DECLARACION | ASIGNACION | CICLO | BIFURCACION | LLAMADA_FUNCION)* LLAVE_DERECHA (sino LLAVE_IZQUIERDA (DECLARACION | ASIGNACION | CICLO | LLAMADA_FUNCION)* LLAVE_DERECHA)?
 CICLO ::= mientras PARENTESIS_IZQUIERDO EXPRESION PARENTESIS_DERECHO LLAVE_IZQUIERDA (DECLARACION | ASIGNACION | CICLO | BIFURCACION | LLAMADA_FUNCION)* LLAVE_DERECHA
@@ -31,15 +48,80 @@ class Nodo:
 
     def preorden(self) -> str:
         """Devuelve una representación en cadena del árbol en preorden"""
-        cadena = f"<'{self.tipo}', '{self.contenido}', {self.atributos}>" + "\n"
-        if "hijos" in self.atributos:
-            for hijo in self.atributos["hijos"]:
-                cadena += hijo.preorden()
-        return cadena
+        lineas = []
+        pendientes = [self]
+        while pendientes:
+            nodo = pendientes.pop()
+            lineas.append(f"<'{nodo.tipo}', '{nodo.contenido}', {nodo.atributos}>\n")
+            if "hijos" in nodo.atributos:
+                pendientes.extend(reversed(nodo.atributos["hijos"]))
+        return "".join(lineas)
+
+    def nombres(self) -> Tuple[Set[str], Set[str]]:
+        """Devuelve los identificadores leídos y asignados dentro del nodo"""
+        leidos, asignados = set(), set()
+        pendientes = [self]
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo.tipo == "IDENTIFICADOR":
+                leidos.add(nodo.atributos["identificador"])
+            elif nodo.tipo in ["DECLARACION", "ASIGNACION"]:
+                asignados.add(nodo.atributos["identificador"])
+            for clave in ["expresion", "hijos", "operandos", "parametros"]:
+                valor = nodo.atributos.get(clave)
+                if isinstance(valor, Nodo):
+                    pendientes.append(valor)
+                elif isinstance(valor, list):
+                    # Los parámetros de una declaración de función son tokens
+                    pendientes.extend(hijo for hijo in valor if isinstance(hijo, Nodo))
+        return leidos, asignados
+
+    def globales_compartidas(self) -> List[str]:
+        """Devuelve las variables de nivel superior que leen las funciones del programa
+
+        También incluye las que comparten nombre con una función del programa:
+        como locales de _principal() ocultarían la función en todo su cuerpo.
+        """
+        _, asignados_programa = Nodo(
+            "PROGRAMA",
+            "",
+            {"hijos": [hijo for hijo in self.atributos["hijos"] if hijo.tipo != "DECLARACION_FUNCION"]},
+        ).nombres()
+        compartidas = set()
+        for hijo in self.atributos["hijos"]:
+            if hijo.tipo != "DECLARACION_FUNCION":
+                continue
+            leidos, asignados = hijo.nombres()
+            parametros = {param.valor for param in hijo.atributos["parametros"] if param.nombre == "IDENTIFICADOR"}
+            compartidas |= (leidos - asignados - parametros) & asignados_programa
+            if hijo.atributos["identificador"] in asignados_programa:
+                compartidas.add(hijo.atributos["identificador"])
+        return sorted(compartidas)
 
-    def generar(self, nivel=0) -> str:
-        """Genera código Python a partir del árbol"""
-        if self.tipo == "PROGRAMA":
+    def generar(self, nivel=0, principal=False) -> str:
+        """Genera código Python a partir del árbol
+
+        Con principal=True las instrucciones de nivel superior se generan
+        dentro de una función _principal(), donde sus variables son locales;
+        solo las que leen las funciones del programa se declaran global. El
+        guion bajo inicial evita chocar con funciones del programa, ya que los
+        identificadores del lenguaje empiezan con una letra.
+        """
+        if self.tipo == "PROGRAMA" and principal:
+            funciones = ""
+            cuerpo = ""
+            for hijo in self.atributos["hijos"]:
+                if hijo.tipo == "DECLARACION_FUNCION":
+                    funciones += hijo.generar()
+                else:
+                    cuerpo += hijo.generar(1)
+            globales = self.globales_compartidas()
+            if globales:
+                cuerpo = f"\tglobal {', '.join(globales)}\n" + cuerpo
+            if not cuerpo:
+                cuerpo = "\tpass\n"
+            return funciones + "def _principal():\n" + cuerpo + 'if __name__ == "__main__":\n\t_principal()\n'
+        elif self.tipo == "PROGRAMA":
             codigo = ""
             for hijo in self.atributos["hijos"]:
                 codigo += hijo.generar()
@@ -56,9 +138,24 @@ class Nodo:
         elif self.tipo == "RETORNO":
             return "\t"*nivel + f"return {self.atributos['expresion'].generar()}\n"
         elif self.tipo == "EXPRESION":
+            precedencia = self.precedencia()
+            partes = []
+            for indice, operando in enumerate(self.atributos["operandos"]):
+                if indice > 0:
+                    partes.append(self.atributos["operadores"][indice - 1])
+                codigo = operando.generar()
+                # Los comparadores no se encadenan: (a < b) < c no es a < b < c en Python
+                if (
+                    operando.tipo == "EXPRESION"
+                    and not operando.atributos["parentesis"]
+                    and operando.precedencia() <= precedencia
+                    and (indice > 0 or precedencia == PRECEDENCIA_COMPARADOR)
+                ):
+                    codigo = f"({codigo})"
+                partes.append(codigo)
             if self.atributos["parentesis"]:
-                return f"({self.atributos['factor_izquierdo'].generar()} {self.atributos['operador']} {self.atributos['factor_derecho'].generar()})"
-            return f"{self.atributos['factor_izquierdo'].generar()} {self.atributos['operador']} {self.atributos['factor_derecho'].generar()}"
+                return "(" + " ".join(partes) + ")"
+            return " ".join(partes)
         elif self.tipo in ["NUMERO_ENTERO", "NUMERO_FLOTANTE", "CADENA"]:
             return self.atributos["valor"]
         elif self.tipo == "BOOLEANO":
@@ -100,6 +197,10 @@ class Nodo:
         else:
             return ""
 
+    def precedencia(self) -> int:
+        """Devuelve la precedencia del operador de una expresión"""
+        return PRECEDENCIAS[self.atributos["operadores"][0]]
+
     def __str__(self):
         """Devuelve una representación en cadena del nodo"""
         return f"<'{self.tipo}', '{self.contenido}', {self.atributos}>"
@@ -109,12 +210,56 @@ class Nodo:
         return str(self)
 
 
+class FabricaNodos:
+    """Fábrica que comparte los subárboles de expresión estructuralmente idénticos
+
+    Los nodos compartidos no deben modificarse después de pasar por la fábrica.
+    """
+
+    def __init__(self):
+        """Inicializa la fábrica con una tabla de nodos vacía"""
+        self.nodos = {}
+        self.compartidos = set()
+
+    def clave(self, nodo) -> tuple:
+        """Devuelve la clave estructural de un nodo cuyos hijos ya son compartidos"""
+        partes = [nodo.tipo]
+        for nombre, valor in nodo.atributos.items():
+            if isinstance(valor, Nodo):
+                valor = id(valor)
+            elif isinstance(valor, list):
+                valor = tuple(id(elemento) if isinstance(elemento, Nodo) else elemento for elemento in valor)
+            partes.append((nombre, valor))
+        return tuple(partes)
+
+    def compartir(self, nodo) -> Nodo:
+        """Devuelve el nodo compartido equivalente a un subárbol de expresión"""
+        if id(nodo) in self.compartidos:
+            return nodo
+        for nombre, valor in nodo.atributos.items():
+            if isinstance(valor, Nodo):
+                nodo.atributos[nombre] = self.compartir(valor)
+            elif isinstance(valor, list):
+                nodo.atributos[nombre] = [
+                    self.compartir(elemento) if isinstance(elemento, Nodo) else elemento for elemento in valor
+                ]
+        clave = self.clave(nodo)
+        if clave not in self.nodos:
+            self.nodos[clave] = nodo
+            self.compartidos.add(id(nodo))
+        return self.nodos[clave]
+
+
 class Analizador:
     """Analizador léxico y sintáctico"""
 
-    def __init__(self, tokens):
-        """Inicializa el analizador con una lista de tokens"""
+    def __init__(self, tokens, compartir=False):
+        """Inicializa el analizador con una lista de tokens
+
+        Con compartir=True las expresiones se construyen con una FabricaNodos.
+        """
         self.tokens = peekable(tokens)
+        self.fabrica = FabricaNodos() if compartir else None
 
     def generar_asa(self) -> Nodo:
         """Genera un árbol sintáctico abstracto a partir de los tokens"""
@@ -231,24 +376,48 @@ class Analizador:
 
     def expresion(self, parentesis=False) -> Nodo:
         """Analiza una expresión"""
-        factor = self.factor()
-        operador = self.tokens.peek()
-        if operador.nombre == "COMA":
-            return factor
-        while operador.nombre in ["OPERADOR", "COMPARADOR"]:
+        expresion = self.expresion_precedencia(PRECEDENCIA_COMPARADOR)
+        if parentesis and expresion.tipo == "EXPRESION":
+            expresion.atributos["parentesis"] = True
+        if self.fabrica is not None:
+            return self.fabrica.compartir(expresion)
+        return expresion
+
+    def expresion_precedencia(self, precedencia_minima) -> Nodo:
+        """Analiza una expresión por escalada de precedencia
+
+        Los operadores de igual precedencia se acumulan en un mismo nodo
+        n-ario, así una cadena larga como a + b + c + ... produce un árbol
+        plano en lugar de uno tan profundo como su cantidad de operandos.
+        """
+        izquierdo = self.factor()
+        while True:
+            operador = self.tokens.peek(None)
+            if operador is None or operador.nombre not in ["OPERADOR", "COMPARADOR"]:
+                return izquierdo
+            precedencia = PRECEDENCIAS[operador.valor]
+            if precedencia < precedencia_minima:
+                return izquierdo
             next(self.tokens)
-            factor = Nodo(
-                "EXPRESION",
-                "",
-                {
-                    "operador": operador.valor,
-                    "factor_izquierdo": factor,
-                    "factor_derecho": self.factor(),
-                    "parentesis": parentesis,
-                },
-            )
-            operador = self.tokens.peek()
-        return factor
+            derecho = self.expresion_precedencia(precedencia + 1)
+            if (
+                izquierdo.tipo == "EXPRESION"
+                and not izquierdo.atributos["parentesis"]
+                and izquierdo.precedencia() == precedencia
+                and precedencia != PRECEDENCIA_COMPARADOR
+            ):
+                izquierdo.atributos["operadores"].append(operador.valor)
+                izquierdo.atributos["operandos"].append(derecho)
+            else:
+                izquierdo = Nodo(
+                    "EXPRESION",
+                    "",
+                    {
+                        "operadores": [operador.valor],
+                        "operandos": [izquierdo, derecho],
+                        "parentesis": False,
+                    },
+                )
 
     def factor(self) -> Nodo:
         """Analiza un factor"""
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 """Explorador de tokens."""
 
+import os
 import re
 import sys
-from typing import List, Tuple
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
 import pickle
 from utilidades.errores import ErrorSintactico
 
@@ -32,6 +35,13 @@ TOKENS: List[Tuple[str, str]] = [
     ("IDENTIFICADOR", r"[a-zA-Z][a-zA-Z0-9_]*"),
 ]
 
+# Construcciones dentro de las cuales no puede empezar ningún otro token, en el
+# mismo orden de prioridad que TOKENS; solo COMENTARIO_MULTILINEA cruza líneas
+PROTEGIDOS = re.compile(r"//.*|/\*(.|\n)*?\*/|\".*\"")
+
+# Tamaño mínimo de la cadena para que valga la pena repartirla entre procesos
+TAMANO_MINIMO_PARALELO = 64 * 1024
+
 
 class Token:
     """Clase que representa un token.
@@ -101,13 +111,17 @@ class Explorador:
         columna (int): Columna actual en la cadena.
     """
 
-    def __init__(self, cadena: str) -> None:
+    def __init__(self, cadena: str, desplazamiento: int = 0, linea_base: int = 1) -> None:
         """Constructor de la clase Explorador.
 
         Args:
             cadena (str): Cadena de texto a explorar.
+            desplazamiento (int): Posición de la cadena dentro del texto completo.
+            linea_base (int): Línea del texto completo en la que empieza la cadena.
         """
         self.cadena = cadena
+        self.desplazamiento = desplazamiento
+        self.linea_base = linea_base
         self.pos = 0
         self.tokens = []
         self.fila = 0
@@ -122,7 +136,7 @@ class Explorador:
         Returns:
             Tuple[int, int]: Fila y columna del caracter.
         """
-        fila = self.cadena[:pos].count("\n") + 1
+        fila = self.cadena[:pos].count("\n") + self.linea_base
         columna = pos - self.cadena[:pos].rfind("\n")
         return fila, columna
 
@@ -146,8 +160,8 @@ class Explorador:
                             Token(
                                 nombre,
                                 valor,
-                                self.pos,
-                                match.end(0),
+                                self.pos + self.desplazamiento,
+                                match.end(0) + self.desplazamiento,
                                 self.fila,
                                 self.columna,
                             )
@@ -164,6 +178,77 @@ class Explorador:
                 )
         return self.tokens
 
+    def puntos_corte(self, partes: int) -> List[int]:
+        """Obtiene posiciones seguras para dividir la cadena en fragmentos.
+
+        Cada posición sigue a un salto de línea que no está dentro de un
+        comentario multilínea, así que el escaneo de cada fragmento produce
+        los mismos tokens que el escaneo secuencial.
+
+        Args:
+            partes (int): Cantidad de fragmentos deseada.
+
+        Returns:
+            List[int]: Posiciones de inicio de cada fragmento después del primero.
+        """
+        protegidos = [
+            (match.start(), match.end())
+            for match in PROTEGIDOS.finditer(self.cadena)
+            if "\n" in match.group(0)
+        ]
+        inicios = [inicio for inicio, _ in protegidos]
+        cortes = []
+        for parte in range(1, partes):
+            objetivo = max(len(self.cadena) * parte // partes, cortes[-1] if cortes else 0)
+            salto = self.cadena.find("\n", objetivo)
+            while salto != -1:
+                indice = bisect_right(inicios, salto) - 1
+                if indice < 0 or protegidos[indice][1] <= salto:
+                    break
+                salto = self.cadena.find("\n", protegidos[indice][1])
+            if salto == -1 or salto + 1 >= len(self.cadena):
+                break
+            if not cortes or salto + 1 > cortes[-1]:
+                cortes.append(salto + 1)
+        return cortes
+
+    def escanear_paralelo(self, procesos: Optional[int] = None) -> List[Token]:
+        """Escanea la cadena repartiéndola en fragmentos entre varios procesos.
+
+        Args:
+            procesos (Optional[int]): Cantidad de procesos; por defecto, la cantidad de CPUs.
+
+        Returns:
+            List[Token]: Lista de tokens, idéntica a la de escanear().
+        """
+        partes = procesos or os.cpu_count() or 1
+        if partes < 2 or len(self.cadena) < TAMANO_MINIMO_PARALELO:
+            return self.escanear()
+        limites = [0] + self.puntos_corte(partes) + [len(self.cadena)]
+        fragmentos = []
+        linea = self.linea_base
+        for inicio, fin in zip(limites, limites[1:]):
+            fragmentos.append((self.cadena[inicio:fin], inicio + self.desplazamiento, linea))
+            linea += self.cadena.count("\n", inicio, fin)
+        self.tokens = []
+        with ProcessPoolExecutor(len(fragmentos)) as ejecutor:
+            for tokens in ejecutor.map(escanear_fragmento, fragmentos):
+                self.tokens.extend(tokens)
+        self.pos = len(self.cadena)
+        return self.tokens
+
+
+def escanear_fragmento(fragmento: Tuple[str, int, int]) -> List[Token]:
+    """Escanea un fragmento de texto en un proceso de trabajo.
+
+    Args:
+        fragmento (Tuple[str, int, int]): Texto, desplazamiento y línea base del fragmento.
+
+    Returns:
+        List[Token]: Lista de tokens del fragmento.
+    """
+    return Explorador(*fragmento).escanear()
+
 
 def main() -> None:
     """Función principal del programa.
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 """Transpilador de un lenguaje a Python"""
 
+import os
 import sys
 from utilidades.args import parse_args
 from explorador.explorador import Explorador
 from analizador.analizador import Analizador
+from optimizador.optimizador import EliminadorSubexpresiones
+from utilidades.volcado import volcar_tokens, volcar_arbol
 
 
 class Transpilador:
@@ -16,14 +19,38 @@ class Transpilador:
 
     def transpilar(self, cadena: str) -> None:
         """Transpila una cadena de texto"""
-        tokens = Explorador(cadena).escanear()
+        if self.args.procesos is None:
+            tokens = Explorador(cadena).escanear()
+        else:
+            tokens = Explorador(cadena).escanear_paralelo(self.args.procesos)
         self.printd("Tokens:", tokens)
 
-        arbol = Analizador(tokens).generar_asa()
+        arbol = Analizador(tokens, self.args.compartir).generar_asa()
+        if self.args.subexpresiones:
+            arbol = EliminadorSubexpresiones(arbol).optimizar()
         self.printd("Árbol:", arbol)
 
+        if self.args.volcado is not None:
+            self.volcar(tokens, arbol)
+
         with open("salida.py" if self.args.output is None else self.args.output, "w", encoding="utf-8") as archivo:
-            archivo.write(arbol.generar())
+            archivo.write(arbol.generar(principal=self.args.principal))
+
+    def volcar(self, tokens, arbol) -> None:
+        """Escribe los tokens y el árbol en formato JSON Lines"""
+        if self.args.volcado == "-":
+            try:
+                volcar_tokens(tokens, sys.stdout, self.args.limite)
+                volcar_arbol(arbol, sys.stdout, self.args.profundidad, self.args.limite)
+                sys.stdout.flush()
+            except BrokenPipeError:
+                # El consumidor cerró la tubería (p. ej. head): salir sin más salida
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                sys.exit(1)
+            return
+        with open(self.args.volcado, "w", encoding="utf-8") as archivo:
+            volcar_tokens(tokens, archivo, self.args.limite)
+            volcar_arbol(arbol, archivo, self.args.profundidad, self.args.limite)
 
     def printd(self, *args, **kwargs) -> None:
         """Imprime un mensaje si el modo depuración está activado"""
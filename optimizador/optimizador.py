@@ -0,0 +1,152 @@
+"""Modulo para optimizar el arbol sintactico abstracto antes de generar codigo"""
+
+from typing import Dict, List, Tuple
+from analizador.analizador import Nodo
+
+
+class EliminadorSubexpresiones:
+    """Eliminación de subexpresiones comunes dentro de cada bloque
+
+    Las expresiones puras (sin llamadas a función) que se repiten en las
+    instrucciones de un mismo bloque, sin que entre ellas se asigne ninguna
+    de las variables que leen, se calculan una sola vez en una variable
+    temporal declarada antes de su primer uso. El árbol original no se
+    modifica, así que puede contener nodos compartidos por una FabricaNodos.
+    """
+
+    # Instrucciones cuya expresión se evalúa una sola vez, antes que su cuerpo
+    EVALUACION_UNICA = ["DECLARACION", "ASIGNACION", "RETORNO", "BIFURCACION"]
+
+    def __init__(self, arbol: Nodo) -> None:
+        """Inicializa el eliminador con el árbol a optimizar"""
+        self.arbol = arbol
+        self.temporales = 0
+        # Memoria por id de nodo; guarda también el nodo para que su id no se reutilice
+        self.analisis: Dict[int, Tuple[Nodo, tuple, frozenset, bool]] = {}
+        self.lecturas_por_clave: Dict[tuple, frozenset] = {}
+
+    def optimizar(self) -> Nodo:
+        """Devuelve un árbol nuevo con las subexpresiones comunes eliminadas"""
+        return self.bloque(self.arbol)
+
+    def analizar(self, nodo: Nodo) -> Tuple[tuple, frozenset, bool]:
+        """Devuelve la clave estructural, las variables leídas y si la expresión es pura"""
+        if id(nodo) not in self.analisis:
+            lecturas = set()
+            puro = nodo.tipo != "LLAMADA_FUNCION"
+            partes = [nodo.tipo]
+            for nombre, valor in nodo.atributos.items():
+                if nombre == "parentesis":
+                    continue
+                hijos = valor if isinstance(valor, list) else [valor]
+                if not any(isinstance(hijo, Nodo) for hijo in hijos):
+                    partes.append((nombre, tuple(hijos) if isinstance(valor, list) else valor))
+                    continue
+                claves_hijos = []
+                for hijo in hijos:
+                    clave, lecturas_hijo, puro_hijo = self.analizar(hijo)
+                    claves_hijos.append(clave)
+                    lecturas |= lecturas_hijo
+                    puro = puro and puro_hijo
+                partes.append((nombre, tuple(claves_hijos)))
+            if nodo.tipo == "IDENTIFICADOR":
+                lecturas.add(nodo.atributos["identificador"])
+            self.analisis[id(nodo)] = (nodo, tuple(partes), frozenset(lecturas), puro)
+            self.lecturas_por_clave[tuple(partes)] = frozenset(lecturas)
+        return self.analisis[id(nodo)][1:]
+
+    def expresiones(self, instruccion: Nodo) -> List[Nodo]:
+        """Devuelve las expresiones de una instrucción que se evalúan una sola vez"""
+        if instruccion.tipo in self.EVALUACION_UNICA:
+            return [instruccion.atributos["expresion"]]
+        if instruccion.tipo == "LLAMADA_FUNCION":
+            return instruccion.atributos["parametros"]
+        return []
+
+    def candidatas(self, expresion: Nodo) -> List[Nodo]:
+        """Devuelve las subexpresiones puras de una expresión"""
+        encontradas = []
+        pendientes = [expresion]
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo.tipo == "EXPRESION" and self.analizar(nodo)[2]:
+                encontradas.append(nodo)
+            for clave in ["operandos", "parametros"]:
+                pendientes.extend(nodo.atributos.get(clave, []))
+        return encontradas
+
+    def bloque(self, nodo: Nodo) -> Nodo:
+        """Optimiza un nodo con hijos, recorriendo también sus bloques internos"""
+        if "hijos" not in nodo.atributos:
+            return nodo
+        hijos = [self.bloque(hijo) for hijo in nodo.atributos["hijos"]]
+
+        # Primer recorrido: agrupar las apariciones de cada expresión en ventanas
+        # que se cierran cuando se asigna alguna de las variables que lee
+        abiertas: Dict[tuple, int] = {}
+        apariciones: List[int] = []
+        ventanas_por_instruccion: List[Dict[tuple, int]] = []
+        for hijo in hijos:
+            ventanas = {}
+            for expresion in self.expresiones(hijo):
+                for candidata in self.candidatas(expresion):
+                    clave = self.analizar(candidata)[0]
+                    if clave not in abiertas:
+                        abiertas[clave] = len(apariciones)
+                        apariciones.append(0)
+                    apariciones[abiertas[clave]] += 1
+                    ventanas[clave] = abiertas[clave]
+            ventanas_por_instruccion.append(ventanas)
+            _, asignados = hijo.nombres()
+            if asignados:
+                for clave in [clave for clave in abiertas if self.lecturas_por_clave[clave] & asignados]:
+                    del abiertas[clave]
+
+        # Segundo recorrido: reemplazar las repetidas por temporales
+        temporales: Dict[int, str] = {}
+        nuevos_hijos = []
+        for hijo, ventanas in zip(hijos, ventanas_por_instruccion):
+            declaraciones = []
+            repetidas = {clave: ventana for clave, ventana in ventanas.items() if apariciones[ventana] > 1}
+            if repetidas:
+                atributos = dict(hijo.atributos)
+                if hijo.tipo == "LLAMADA_FUNCION":
+                    atributos["parametros"] = [
+                        self.reemplazar(parametro, repetidas, temporales, declaraciones)
+                        for parametro in atributos["parametros"]
+                    ]
+                else:
+                    atributos["expresion"] = self.reemplazar(
+                        atributos["expresion"], repetidas, temporales, declaraciones
+                    )
+                hijo = Nodo(hijo.tipo, hijo.contenido, atributos)
+            nuevos_hijos.extend(declaraciones)
+            nuevos_hijos.append(hijo)
+        if nuevos_hijos == nodo.atributos["hijos"]:
+            return nodo
+        return Nodo(nodo.tipo, nodo.contenido, {**nodo.atributos, "hijos": nuevos_hijos})
+
+    def reemplazar(
+        self,
+        nodo: Nodo,
+        repetidas: Dict[tuple, int],
+        temporales: Dict[int, str],
+        declaraciones: List[Nodo],
+    ) -> Nodo:
+        """Devuelve la expresión con sus subexpresiones repetidas reemplazadas"""
+        if nodo.tipo == "EXPRESION" and self.analizar(nodo)[2]:
+            ventana = repetidas.get(self.analizar(nodo)[0])
+            if ventana is not None:
+                if ventana not in temporales:
+                    temporales[ventana] = f"_cse{self.temporales}"
+                    self.temporales += 1
+                    declaraciones.append(
+                        Nodo("ASIGNACION", "", {"identificador": temporales[ventana], "expresion": nodo})
+                    )
+                return Nodo("IDENTIFICADOR", "", {"identificador": temporales[ventana]})
+        for clave in ["operandos", "parametros"]:
+            if clave in nodo.atributos:
+                hijos = [self.reemplazar(hijo, repetidas, temporales, declaraciones) for hijo in nodo.atributos[clave]]
+                if any(nuevo is not viejo for nuevo, viejo in zip(hijos, nodo.atributos[clave])):
+                    return Nodo(nodo.tipo, nodo.contenido, {**nodo.atributos, clave: hijos})
+        return nodo
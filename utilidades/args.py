@@ -7,6 +7,21 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Transpilador de un lenguaje a Python")
     parser.add_argument("-d", "--debug", action="store_true", help="Modo debug")
     parser.add_argument("-o", "--output", help="Archivo de salida")
+    parser.add_argument(
+        "-p", "--principal", action="store_true", help="Genera el código de nivel superior dentro de una función _principal()"
+    )
+    parser.add_argument(
+        "--compartir", action="store_true", help="Comparte los subárboles de expresión idénticos"
+    )
+    parser.add_argument(
+        "--subexpresiones", action="store_true", help="Calcula una sola vez las subexpresiones repetidas"
+    )
+    parser.add_argument(
+        "--procesos", type=int, help="Escanea la entrada en paralelo con esta cantidad de procesos"
+    )
+    parser.add_argument("-j", "--volcado", help="Archivo JSON Lines con tokens y árbol ('-' para la salida estándar)")
+    parser.add_argument("--profundidad", type=int, help="Profundidad máxima del árbol en el volcado")
+    parser.add_argument("--limite", type=int, help="Cantidad máxima de tokens y de nodos en el volcado")
     parser.add_argument("input_file", help="Archivo de entrada")
     return parser.parse_args()
 
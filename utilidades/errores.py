@@ -4,5 +4,10 @@ class ErrorSintactico(Exception):
     """Error sintáctico"""
     def __init__(self, mensaje, linea, columna):
         super().__init__(f"error sintáctico en la línea {linea}, columna {columna}: {mensaje}")
+        self.mensaje = mensaje
         self.linea = linea
         self.columna = columna
+
+    def __reduce__(self):
+        """Permite reconstruir el error al recibirlo de otro proceso"""
+        return (self.__class__, (self.mensaje, self.linea, self.columna))
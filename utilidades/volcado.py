@@ -0,0 +1,86 @@
+"""Volcado de tokens y árboles sintácticos en formato JSON Lines"""
+
+import json
+from typing import Iterable, Optional, TextIO
+from explorador.explorador import Token
+from analizador.analizador import Nodo
+
+
+def token_a_diccionario(token: Token) -> dict:
+    """Convierte un token en un diccionario serializable"""
+    return {
+        "nombre": token.nombre,
+        "valor": token.valor,
+        "inicio": token.inicio,
+        "fin": token.fin,
+        "linea": token.linea,
+        "columna": token.columna,
+    }
+
+
+def volcar_tokens(tokens: Iterable[Token], archivo: TextIO, limite: Optional[int] = None) -> int:
+    """Escribe un token por línea y devuelve la cantidad de líneas escritas"""
+    escritos = 0
+    for token in tokens:
+        if limite is not None and escritos >= limite:
+            break
+        archivo.write(json.dumps({"tipo": "token", **token_a_diccionario(token)}, ensure_ascii=False) + "\n")
+        escritos += 1
+    return escritos
+
+
+def volcar_arbol(
+    arbol: Nodo,
+    archivo: TextIO,
+    profundidad_maxima: Optional[int] = None,
+    limite: Optional[int] = None,
+) -> int:
+    """Escribe un nodo por línea en preorden y devuelve la cantidad de líneas escritas
+
+    Cada línea referencia a su padre por identificador y al atributo del
+    padre que la contiene, de modo que el árbol se reconstruye sin anidar.
+    Los hijos por debajo de profundidad_maxima no se visitan; su cantidad
+    queda en "omitidos".
+    """
+    escritos = 0
+    pendientes = [(arbol, 0, None, None)]
+    while pendientes:
+        if limite is not None and escritos >= limite:
+            break
+        nodo, profundidad, padre, campo = pendientes.pop()
+        identificador = escritos
+        atributos = {}
+        hijos = []
+        for clave, valor in nodo.atributos.items():
+            if isinstance(valor, Nodo):
+                hijos.append((clave, valor))
+            elif isinstance(valor, list):
+                atributos[clave] = []
+                for elemento in valor:
+                    if isinstance(elemento, Nodo):
+                        hijos.append((clave, elemento))
+                    elif isinstance(elemento, Token):
+                        atributos[clave].append(token_a_diccionario(elemento))
+                    else:
+                        atributos[clave].append(elemento)
+                if not atributos[clave]:
+                    del atributos[clave]
+            else:
+                atributos[clave] = valor
+        registro = {
+            "tipo": "nodo",
+            "id": identificador,
+            "padre": padre,
+            "campo": campo,
+            "profundidad": profundidad,
+            "nodo": nodo.tipo,
+            "atributos": atributos,
+        }
+        if profundidad_maxima is not None and profundidad >= profundidad_maxima:
+            registro["omitidos"] = len(hijos)
+        else:
+            for clave, hijo in reversed(hijos):
+                pendientes.append((hijo, profundidad + 1, identificador, clave))
+        archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        escritos += 1
+    return escritos